@@ -13,6 +13,45 @@ class Settings(BaseSettings):
 
     environment: str | None = None
 
+    # Load shedding in front of the DB pool (see app/load_shedding.py)
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout_seconds: float = 5.0
+    db_statement_timeout_ms: int = 5000
+    db_max_in_flight: int = 10
+    db_min_in_flight: int = 2
+    db_max_queue_size: int = 50
+    db_target_queue_delay_ms: int = 100
+    db_max_queue_wait_ms: int = 1000
+    db_shed_retry_after_seconds: int = 1
+
+    # Opt-in request profiling (see app/profiling.py); toggle at runtime
+    # via PUT /debug/profiling
+    profiling_enabled: bool = False
+    profiling_slow_request_ms: int = 500
+    profiling_sample_interval_ms: int = 5
+    profiling_keep_slowest: int = 10
+
+    # Completed periods older than this are moved to the archive tables by
+    # archive_periods.py
+    archive_horizon_years: int = 10
+
+    # In-process interval index for write-path overlap checks
+    interval_index_max_owners: int = 1000
+    interval_index_max_age_seconds: int = 300
+
+    # Reminders ahead of predicted_next_start (see app/reminders.py)
+    reminders_enabled: bool = False
+    reminder_sender: str = "local"
+    reminder_lead_days: int = 2
+    reminder_hour_utc: int = 9
+    reminder_batch_size: int = 100
+    reminder_tick_seconds: int = 60
+
+    # Idempotency-Key replay window for mutation endpoints
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+
     @model_validator(mode="after")
     def fix_database_url(self):
         # Some providers give postgresql:// but asyncpg needs postgresql+asyncpg://
@@ -1,11 +1,38 @@
+from contextlib import asynccontextmanager
+
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from app.auth import verify_api_key
 from app.config import settings
+from app.load_shedding import db_limiter
+from app.profiling import install_sql_hooks
 
-engine = create_async_engine(settings.database_url)
+engine = create_async_engine(
+    settings.database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    # Applied server-side to every statement, so a stuck query frees its
+    # connection instead of holding a limiter slot indefinitely.
+    connect_args={
+        "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    },
+)
+install_sql_hooks(engine)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
-async def get_db():
-    async with async_session() as session:
+@asynccontextmanager
+async def db_session():
+    """Open a session once a DB slot is free; raises Overloaded if shed."""
+    async with db_limiter.slot():
+        async with async_session() as session:
+            yield session
+
+
+async def get_db(owner: str = Depends(verify_api_key)):
+    # Depending on auth makes it run before a slot is taken, so rejected or
+    # rate-limited requests never hold one.
+    async with db_session() as session:
         yield session
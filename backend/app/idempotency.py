@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from app.config import settings
+
+MUTATION_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+# Transient rejections a retry should get past rather than replay
+_UNCACHED_STATUSES = {401, 408, 429}
+
+
+class IdempotencyStore:
+    """Caller-scoped responses to mutation requests, kept for ``ttl`` seconds.
+
+    Entries: { scoped_key: {"fingerprint", "status", "headers", "body", "expires_at"} }
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.in_flight: dict[str, asyncio.Event] = {}
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry["expires_at"]:
+            del self._entries[key]
+            return None
+        return entry
+
+    def put(self, key: str, fingerprint: str, status: int, headers: list, body: bytes) -> None:
+        self._entries[key] = {
+            "fingerprint": fingerprint,
+            "status": status,
+            "headers": headers,
+            "body": body,
+            "expires_at": time.monotonic() + self.ttl,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+store = IdempotencyStore(
+    ttl=settings.idempotency_ttl_seconds, max_entries=settings.idempotency_max_entries
+)
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_json(send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, entry: dict) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": entry["status"],
+        "headers": entry["headers"] + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": entry["body"]})
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated Idempotency-Key.
+
+    Applies to mutation requests under ``path_prefix``. Keys are scoped to
+    the caller's API key, method and path, so a replay only ever returns a
+    response originally produced for the same credentials. Reusing a key
+    with a different body is rejected with 422. 2xx and 4xx responses are
+    stored; 5xx (including load-shedding 503s) are not, so those retries
+    run for real, as do auth failures and rate limiting.
+    """
+
+    def __init__(self, app, path_prefix: str = "/periods"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATION_METHODS
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = _header(scope, b"idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Invalid Idempotency-Key")
+            return
+
+        # Buffer the body so it can be fingerprinted and then replayed downstream.
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        api_key = _header(scope, b"x-api-key") or ""
+        scoped_key = hashlib.sha256(
+            "\0".join([api_key, scope["method"], scope["path"], idempotency_key]).encode()
+        ).hexdigest()
+
+        # A concurrent retry waits for the original to finish, then replays it.
+        while (pending := store.in_flight.get(scoped_key)) is not None:
+            await pending.wait()
+
+        entry = store.get(scoped_key)
+        if entry is not None:
+            if entry["fingerprint"] != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key reused with a different request body")
+            else:
+                await _replay(send, entry)
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": 500, "headers": [], "body": []}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        done = store.in_flight[scoped_key] = asyncio.Event()
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            if response["status"] < 500 and response["status"] not in _UNCACHED_STATUSES:
+                store.put(
+                    scoped_key, fingerprint, response["status"], response["headers"], b"".join(response["body"])
+                )
+        finally:
+            del store.in_flight[scoped_key]
+            done.set()
@@ -0,0 +1,126 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.config import settings
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of waiting for a DB slot."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server overloaded")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Adaptive cap on in-flight DB-bound requests.
+
+    Requests over the limit wait in a bounded FIFO queue. Anyone still
+    waiting after ``max_queue_wait`` seconds is shed with ``Overloaded``.
+    The limit itself follows AIMD on the observed queueing delay: it is cut
+    when waits exceed ``target_queue_delay`` and grows back one slot at a
+    time while they stay under it.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        min_in_flight: int,
+        max_queue_size: int,
+        target_queue_delay: float,
+        max_queue_wait: float,
+        retry_after: int,
+    ):
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.max_queue_size = max_queue_size
+        self.target_queue_delay = target_queue_delay
+        self.max_queue_wait = max_queue_wait
+        self.retry_after = retry_after
+
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.shed_count = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        queued_at = time.monotonic()
+        await self._acquire()
+        self._adapt(time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue_size:
+            self._shed()
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout=self.max_queue_wait)
+        except BaseException as exc:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just as we timed out or were
+                # cancelled; pass it on rather than leak it.
+                self._release()
+            if isinstance(exc, TimeoutError):
+                self._shed()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter so in_flight stays put,
+        # unless the limit has shrunk below what is currently running.
+        if self.in_flight <= self.limit:
+            while self._waiters:
+                fut = self._waiters.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    return
+        self.in_flight -= 1
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+
+    def _adapt(self, queue_delay: float) -> None:
+        now = time.monotonic()
+        if queue_delay > self.target_queue_delay:
+            # Back off at most once per target interval so a single burst
+            # doesn't collapse the limit to the floor.
+            if now - self._last_decrease >= self.target_queue_delay:
+                self.limit = max(self.min_in_flight, math.floor(self.limit * 0.9))
+                self._last_decrease = now
+        elif self.limit < self.max_in_flight:
+            self.limit += 1
+            self._wake()
+
+    def _shed(self) -> None:
+        self.shed_count += 1
+        raise Overloaded(self.retry_after)
+
+
+db_limiter = ConcurrencyLimiter(
+    max_in_flight=settings.db_max_in_flight,
+    min_in_flight=settings.db_min_in_flight,
+    max_queue_size=settings.db_max_queue_size,
+    target_queue_delay=settings.db_target_queue_delay_ms / 1000,
+    max_queue_wait=settings.db_max_queue_wait_ms / 1000,
+    retry_after=settings.db_shed_retry_after_seconds,
+)
@@ -1,12 +1,42 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from slowapi.errors import RateLimitExceeded
 from starlette.responses import JSONResponse
 
 from app.auth import limiter
+from app.config import settings
+from app.idempotency import IdempotencyMiddleware
+from app.load_shedding import Overloaded
+from app.profiling import ProfilingMiddleware
+from app.reminders import scheduler
+from app.routes.debug import router as debug_router
 from app.routes.periods import router as periods_router
+from app.services.archive_service import OWNERS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not settings.reminders_enabled:
+        yield
+        return
+
+    scheduler.load(OWNERS)
+    task = asyncio.create_task(scheduler.run(settings.reminder_tick_seconds))
+    yield
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
 
-app = FastAPI(title="Period Tracker API", docs_url=None, redoc_url=None, openapi_url=None)
+
+app = FastAPI(
+    title="Period Tracker API", docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan
+)
 app.state.limiter = limiter
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(IdempotencyMiddleware)
 
 
 @app.exception_handler(RateLimitExceeded)
@@ -14,9 +44,19 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
 
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server overloaded, retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
 app.include_router(periods_router)
+app.include_router(debug_router)
@@ -1,6 +1,7 @@
 import datetime
 
-from sqlalchemy import Date, DateTime, Integer, UniqueConstraint, func
+from sqlalchemy import BigInteger, Date, DateTime, Integer, String, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -10,7 +11,14 @@ class Base(DeclarativeBase):
 
 class Period(Base):
     __tablename__ = "periods"
-    __table_args__ = (UniqueConstraint("start_date", name="uq_periods_start_date"),)
+    __table_args__ = (
+        UniqueConstraint("start_date", name="uq_periods_start_date"),
+        ExcludeConstraint(
+            (text("daterange(start_date, end_date, '[]')"), "&&"),
+            name="periods_no_overlap",
+            using="gist",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     start_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
@@ -22,7 +30,14 @@ class Period(Base):
 
 class DemoPeriod(Base):
     __tablename__ = "demo_periods"
-    __table_args__ = (UniqueConstraint("start_date", name="uq_demo_periods_start_date"),)
+    __table_args__ = (
+        UniqueConstraint("start_date", name="uq_demo_periods_start_date"),
+        ExcludeConstraint(
+            (text("daterange(start_date, end_date, '[]')"), "&&"),
+            name="demo_periods_no_overlap",
+            using="gist",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     start_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
@@ -30,3 +45,43 @@ class DemoPeriod(Base):
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+
+
+class PeriodArchive(Base):
+    __tablename__ = "periods_archive"
+    # Surfaced on PeriodResponse; archived periods are read-only
+    archived = True
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    start_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    created_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class DemoPeriodArchive(Base):
+    __tablename__ = "demo_periods_archive"
+    # Surfaced on PeriodResponse; archived periods are read-only
+    archived = True
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    start_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    created_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class ArchiveSummary(Base):
+    """Per-owner aggregates of archived periods, enough for get_stats to
+    produce the same averages as if the archived rows were still hot."""
+
+    __tablename__ = "archive_summaries"
+
+    owner: Mapped[str] = mapped_column(String, primary_key=True)
+    period_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # sum(length_i * i) over archived period lengths, in start_date order
+    length_weighted_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cycle_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # sum(gap_i * i) over archived cycle gaps that pass the outlier filter
+    cycle_weighted_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_start_date: Mapped[datetime.date | None] = mapped_column(Date)
+    last_end_date: Mapped[datetime.date | None] = mapped_column(Date)
+
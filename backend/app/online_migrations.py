@@ -0,0 +1,254 @@
+"""Helpers for running schema changes on large tables without long locks.
+
+Intended for use inside Alembic migration scripts, e.g. adding a column:
+
+    def upgrade() -> None:
+        op.add_column("periods", sa.Column("owner", sa.Text(), nullable=True))
+        backfill_in_batches("periods", "owner = 'user'", "owner IS NULL")
+        create_index_concurrently("ix_periods_owner", "periods", ["owner"])
+        add_check_constraint_not_valid(
+            "ck_periods_owner_not_null", "periods", "owner IS NOT NULL"
+        )
+        validate_constraint("ck_periods_owner_not_null", "periods")
+
+Each helper commits its own work (via Alembic's autocommit block), so a
+migration using them is not atomic. They are written to be re-runnable:
+backfills resume from a checkpoint and DDL is skipped if already applied.
+"""
+
+import logging
+import time
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+CHECKPOINT_TABLE = "online_migration_checkpoints"
+
+# Fail fast instead of queueing behind (and blocking) live traffic when a
+# DDL statement can't get its lock; the migration can simply be retried.
+DEFAULT_LOCK_TIMEOUT = "5s"
+
+
+def _require_online() -> None:
+    if op.get_context().as_sql:
+        raise RuntimeError("Online migration helpers need a live connection (not --sql mode)")
+
+
+def _execute_ddl(statement: str, lock_timeout: str) -> None:
+    bind = op.get_bind()
+    bind.execute(sa.text(f"SET lock_timeout = '{lock_timeout}'"))
+    try:
+        bind.execute(sa.text(statement))
+    finally:
+        bind.execute(sa.text("RESET lock_timeout"))
+
+
+def _constraint_exists(name: str) -> bool:
+    return (
+        op.get_bind()
+        .execute(sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": name})
+        .first()
+        is not None
+    )
+
+
+def _ensure_checkpoint_table() -> None:
+    op.get_bind().execute(
+        sa.text(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+            "name TEXT PRIMARY KEY, "
+            "last_id BIGINT NOT NULL, "
+            "rows_done BIGINT NOT NULL DEFAULT 0, "
+            "updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+
+
+def _load_checkpoint(name: str) -> tuple[int, int]:
+    row = op.get_bind().execute(
+        sa.text(f"SELECT last_id, rows_done FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+        {"name": name},
+    ).first()
+    return (row.last_id, row.rows_done) if row else (0, 0)
+
+
+def _save_checkpoint(name: str, last_id: int, rows_done: int) -> None:
+    op.get_bind().execute(
+        sa.text(
+            f"INSERT INTO {CHECKPOINT_TABLE} (name, last_id, rows_done) "
+            "VALUES (:name, :last_id, :rows_done) "
+            "ON CONFLICT (name) DO UPDATE SET last_id = :last_id, "
+            "rows_done = :rows_done, updated_at = now()"
+        ),
+        {"name": name, "last_id": last_id, "rows_done": rows_done},
+    )
+
+
+def _delete_checkpoint(name: str) -> None:
+    op.get_bind().execute(
+        sa.text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE name = :name"), {"name": name}
+    )
+
+
+def backfill_in_batches(
+    table: str,
+    set_clause: str,
+    pending_condition: str,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.1,
+    checkpoint_name: str | None = None,
+) -> int:
+    """UPDATE ``table`` in keyset-ordered batches of ``batch_size`` ids.
+
+    Each batch commits on its own, so row locks are only held briefly, and
+    the highest id processed is checkpointed so an interrupted backfill
+    resumes where it left off. The checkpoint is removed on completion. Sleeps ``pause_seconds`` between batches to
+    leave room for live traffic. Returns the total number of rows updated.
+    """
+    _require_online()
+    name = checkpoint_name or f"{table}:{set_clause}"
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        _ensure_checkpoint_table()
+        last_id, rows_done = _load_checkpoint(name)
+        started = time.monotonic()
+
+        update = sa.text(
+            f"UPDATE {table} SET {set_clause} WHERE id IN ("
+            f"SELECT id FROM {table} WHERE id > :last_id AND ({pending_condition}) "
+            "ORDER BY id LIMIT :batch_size) "
+            "RETURNING id"
+        )
+        while True:
+            ids = bind.execute(update, {"last_id": last_id, "batch_size": batch_size}).scalars().all()
+            if not ids:
+                # pending_condition already makes a rerun idempotent; the
+                # checkpoint only needs to outlive an interrupted run.
+                _delete_checkpoint(name)
+                break
+            last_id = max(ids)
+            rows_done += len(ids)
+            _save_checkpoint(name, last_id, rows_done)
+            elapsed = time.monotonic() - started
+            logger.info(
+                "Backfill %s: %d rows (last id %d, %.0f rows/s)",
+                name, rows_done, last_id, rows_done / elapsed if elapsed else 0,
+            )
+            time.sleep(pause_seconds)
+
+    return rows_done
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: list[str],
+    unique: bool = False,
+    lock_timeout: str = DEFAULT_LOCK_TIMEOUT,
+) -> None:
+    """CREATE INDEX CONCURRENTLY, dropping a leftover INVALID build first."""
+    _require_online()
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        valid = bind.execute(
+            sa.text(
+                "SELECT i.indisvalid FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).scalar_one_or_none()
+        if valid:
+            return
+        if valid is False:
+            # A previous concurrent build failed part-way and left this behind.
+            _execute_ddl(f"DROP INDEX CONCURRENTLY IF EXISTS {name}", lock_timeout)
+
+        unique_sql = "UNIQUE " if unique else ""
+        _execute_ddl(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY {name} ON {table} ({', '.join(columns)})",
+            lock_timeout,
+        )
+
+
+def add_unique_constraint_online(
+    name: str, table: str, columns: list[str], lock_timeout: str = DEFAULT_LOCK_TIMEOUT
+) -> None:
+    """Build the unique index concurrently, then attach it as a constraint.
+
+    ``ADD CONSTRAINT ... UNIQUE USING INDEX`` only takes a brief lock, unlike
+    ``op.create_unique_constraint`` which builds the index under the lock.
+    """
+    _require_online()
+    create_index_concurrently(name, table, columns, unique=True, lock_timeout=lock_timeout)
+    with op.get_context().autocommit_block():
+        if _constraint_exists(name):
+            return
+        _execute_ddl(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}",
+            lock_timeout,
+        )
+
+
+def add_check_constraint_not_valid(
+    name: str, table: str, condition: str, lock_timeout: str = DEFAULT_LOCK_TIMEOUT
+) -> None:
+    """Add a CHECK constraint enforced for new rows only; see validate_constraint."""
+    _require_online()
+    with op.get_context().autocommit_block():
+        if _constraint_exists(name):
+            return
+        _execute_ddl(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID",
+            lock_timeout,
+        )
+
+
+def add_foreign_key_not_valid(
+    name: str,
+    table: str,
+    columns: list[str],
+    referent: str,
+    referent_columns: list[str],
+    lock_timeout: str = DEFAULT_LOCK_TIMEOUT,
+) -> None:
+    """Add a FOREIGN KEY enforced for new rows only; see validate_constraint."""
+    _require_online()
+    with op.get_context().autocommit_block():
+        if _constraint_exists(name):
+            return
+        _execute_ddl(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} "
+            f"FOREIGN KEY ({', '.join(columns)}) "
+            f"REFERENCES {referent} ({', '.join(referent_columns)}) NOT VALID",
+            lock_timeout,
+        )
+
+
+def add_exclusion_constraint(
+    name: str, table: str, definition: str, lock_timeout: str = DEFAULT_LOCK_TIMEOUT
+) -> None:
+    """ADD CONSTRAINT ... EXCLUDE under a short lock_timeout.
+
+    Exclusion constraints can be neither NOT VALID nor attached from a
+    concurrently built index, so the gist index is built while holding
+    ACCESS EXCLUSIVE on the table. Only use this on small tables.
+    """
+    _require_online()
+    with op.get_context().autocommit_block():
+        if _constraint_exists(name):
+            return
+        _execute_ddl(f"ALTER TABLE {table} ADD CONSTRAINT {name} EXCLUDE {definition}", lock_timeout)
+
+
+def validate_constraint(name: str, table: str, lock_timeout: str = DEFAULT_LOCK_TIMEOUT) -> None:
+    """VALIDATE a NOT VALID constraint in its own transaction.
+
+    Validation scans the table under SHARE UPDATE EXCLUSIVE, which does not
+    block reads or writes.
+    """
+    _require_online()
+    with op.get_context().autocommit_block():
+        _execute_ddl(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}", lock_timeout)
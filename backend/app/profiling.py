@@ -0,0 +1,202 @@
+import contextvars
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_profile: contextvars.ContextVar["RequestProfile | None"] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+class RequestProfile:
+    """SQL timings and stack samples collected for a single request."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = time.perf_counter()
+        self.duration_ms = 0.0
+        # { statement: [count, total_ms] }
+        self.statements: dict[str, list] = {}
+        # Written by the sampler thread while the request is still on the
+        # stack, including during Profiler.finish; guarded by _samples_lock.
+        self.samples: Counter[str] = Counter()
+        self._samples_lock = threading.Lock()
+
+    @property
+    def statement_count(self) -> int:
+        return sum(count for count, _ in self.statements.values())
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(total for _, total in self.statements.values())
+
+    def record_statement(self, statement: str, elapsed_ms: float) -> None:
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed_ms
+
+    def add_sample(self, stack: str) -> None:
+        with self._samples_lock:
+            self.samples[stack] += 1
+
+    def summary(self, top: int = 5) -> dict:
+        with self._samples_lock:
+            top_stacks = self.samples.most_common(top)
+        statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration_ms, 1),
+            "statement_count": self.statement_count,
+            "sql_ms": round(self.sql_ms, 1),
+            "statements": [
+                {"sql": " ".join(sql.split()), "count": count, "total_ms": round(total, 1)}
+                for sql, (count, total) in statements[:top]
+            ],
+            "top_stacks": [
+                {"stack": stack, "samples": n} for stack, n in top_stacks
+            ],
+        }
+
+
+class Profiler:
+    """Opt-in request profiler, toggled at runtime via /debug/profiling.
+
+    While enabled, every request records its SQL statement count and timing.
+    Requests over ``slow_request_ms`` are logged with their SQL breakdown and
+    kept among the ``keep_slowest`` slowest seen. A background thread samples
+    the event loop thread's stack so CPU time spent in handlers can be
+    attributed to the request that was running.
+    """
+
+    def __init__(self, slow_request_ms: int, sample_interval_ms: int, keep_slowest: int):
+        self.enabled = False
+        self.slow_request_ms = slow_request_ms
+        self.sample_interval_ms = sample_interval_ms
+        self.keep_slowest = keep_slowest
+        self.loop_thread_id: int | None = None
+        self._slowest: list[tuple[float, int, RequestProfile]] = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, args=(self._stop,), name="profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._sampler = None
+
+    def slowest(self) -> list[dict]:
+        return [p.summary() for _, _, p in sorted(self._slowest, reverse=True)]
+
+    def finish(self, profile: RequestProfile) -> None:
+        profile.duration_ms = (time.perf_counter() - profile.started_at) * 1000
+        if profile.duration_ms < self.slow_request_ms:
+            return
+
+        summary = profile.summary()
+        logger.warning(
+            "Slow request %s %s: %.1fms, %d statements, %.1fms in SQL: %s",
+            profile.method,
+            profile.path,
+            profile.duration_ms,
+            profile.statement_count,
+            profile.sql_ms,
+            summary["statements"],
+        )
+
+        entry = (profile.duration_ms, next(self._seq), profile)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    def _sample_loop(self, stop: threading.Event) -> None:
+        interval = self.sample_interval_ms / 1000
+        while not stop.wait(interval):
+            if self.loop_thread_id is None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = []
+            while frame is not None:
+                if frame.f_code is ProfilingMiddleware.__call__.__code__:
+                    profile = frame.f_locals.get("profile")
+                    if profile is not None:
+                        profile.add_sample(";".join(reversed(stack)))
+                    break
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+
+
+profiler = Profiler(
+    slow_request_ms=settings.profiling_slow_request_ms,
+    sample_interval_ms=settings.profiling_sample_interval_ms,
+    keep_slowest=settings.profiling_keep_slowest,
+)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware so handlers run in the same task (and stack) as this frame."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        profiler.loop_thread_id = threading.get_ident()
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_profile.reset(token)
+            profiler.finish(profile)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started_at = conn.info.pop("query_start", None)
+    if profile is None or started_at is None:
+        return
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    profile.record_statement(statement, elapsed_ms)
+
+
+def install_sql_hooks(engine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+if settings.profiling_enabled:
+    profiler.enable()
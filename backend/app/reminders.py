@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+from abc import ABC, abstractmethod
+import heapq
+import itertools
+import logging
+
+from app.config import settings
+from app.database import db_session
+from app.services.period_service import get_stats, on_stats_invalidated
+
+logger = logging.getLogger(__name__)
+
+
+class Reminder:
+    def __init__(self, owner: str, predicted_start: datetime.date, remind_at: datetime.datetime):
+        self.owner = owner
+        self.predicted_start = predicted_start
+        self.remind_at = remind_at
+
+    def __repr__(self) -> str:
+        return f"Reminder({self.owner!r}, {self.predicted_start}, {self.remind_at:%Y-%m-%d %H:%M})"
+
+
+class ReminderSender(ABC):
+    """Delivers a batch of due reminders. Subclass for a real channel."""
+
+    @abstractmethod
+    async def send(self, reminders: list[Reminder]) -> None: ...
+
+
+class LocalSender(ReminderSender):
+    """Logs reminders and keeps them in memory; for local runs and tests."""
+
+    def __init__(self):
+        self.sent: list[Reminder] = []
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        self.sent.extend(reminders)
+        for reminder in reminders:
+            logger.info("Reminder: %s", reminder)
+
+
+SENDERS: dict[str, type[ReminderSender]] = {"local": LocalSender}
+
+
+class ReminderScheduler:
+    """Min-heap of upcoming reminder times, one live entry per owner.
+
+    Stats invalidations only mark an owner dirty; each tick recomputes the
+    dirty owners and pops whatever is due, so a tick costs
+    O((dirty + due) log n) rather than a scan over every owner. Superseded
+    heap entries are skipped lazily when they surface.
+    """
+
+    def __init__(self, sender: ReminderSender, lead_days: int, hour_utc: int, batch_size: int):
+        self.sender = sender
+        self.lead_days = lead_days
+        self.hour_utc = hour_utc
+        self.batch_size = batch_size
+        self._heap: list[tuple[datetime.datetime, int, Reminder]] = []
+        # owner -> the one heap entry that is still live for them
+        self._live: dict[str, Reminder] = {}
+        self._dirty: set[str] = set()
+        # Owners whose first recompute after startup hasn't happened yet
+        self._starting: set[str] = set()
+        self._started_at = datetime.datetime.now(datetime.timezone.utc)
+        # owner -> predicted start already reminded about, so edits that
+        # leave the prediction unchanged don't trigger a second reminder
+        self._sent: dict[str, datetime.date] = {}
+        self._seq = itertools.count()
+
+    def mark_dirty(self, owner: str) -> None:
+        if owner != "demo":
+            self._dirty.add(owner)
+
+    def schedule(self, owner: str, predicted_start: datetime.date | None) -> None:
+        """Replace owner's pending reminder with one for predicted_start."""
+        self._live.pop(owner, None)
+        if predicted_start is None or predicted_start < datetime.date.today():
+            return
+        if self._sent.get(owner) == predicted_start:
+            return
+        remind_on = predicted_start - datetime.timedelta(days=self.lead_days)
+        remind_at = datetime.datetime.combine(
+            remind_on, datetime.time(self.hour_utc), tzinfo=datetime.timezone.utc
+        )
+        reminder = Reminder(owner, predicted_start, remind_at)
+        self._live[owner] = reminder
+        heapq.heappush(self._heap, (remind_at, next(self._seq), reminder))
+
+    def pop_due(self, now: datetime.datetime) -> list[Reminder]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            _, _, reminder = heapq.heappop(self._heap)
+            if self._live.get(reminder.owner) is reminder:
+                del self._live[reminder.owner]
+                self._sent[reminder.owner] = reminder.predicted_start
+                due.append(reminder)
+        return due
+
+    def load(self, owners: tuple[str, ...]) -> None:
+        """Mark every owner dirty so the first tick schedules from live stats.
+
+        On that first recompute, reminders that were already due at startup
+        are dropped rather than sent, since they may have gone out before a
+        restart.
+        """
+        for owner in owners:
+            self.mark_dirty(owner)
+        self._starting = set(self._dirty)
+        self._started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    async def tick(self, now: datetime.datetime | None = None) -> int:
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            try:
+                async with db_session() as db:
+                    for owner in list(dirty):
+                        stats = await get_stats(db, owner)
+                        self.schedule(owner, stats.predicted_next_start)
+                        dirty.discard(owner)
+                        if owner in self._starting:
+                            self._starting.discard(owner)
+                            reminder = self._live.get(owner)
+                            if reminder is not None and reminder.remind_at <= self._started_at:
+                                del self._live[owner]
+            finally:
+                # Anything not recomputed (e.g. shed under load) waits for the next tick.
+                self._dirty |= dirty
+
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        sent = 0
+        while batch := self.pop_due(now):
+            await self.sender.send(batch)
+            sent += len(batch)
+        return sent
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Reminder tick failed")
+            await asyncio.sleep(interval)
+
+
+scheduler = ReminderScheduler(
+    sender=SENDERS[settings.reminder_sender](),
+    lead_days=settings.reminder_lead_days,
+    hour_utc=settings.reminder_hour_utc,
+    batch_size=settings.reminder_batch_size,
+)
+on_stats_invalidated(scheduler.mark_dirty)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.auth import verify_api_key
+from app.profiling import profiler
+from app.schemas import ProfilingConfig, ProfilingStatus
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def _require_user(owner: str = Depends(verify_api_key)) -> str:
+    if owner != "user":
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return owner
+
+
+def _status() -> ProfilingStatus:
+    return ProfilingStatus(
+        enabled=profiler.enabled,
+        slow_request_ms=profiler.slow_request_ms,
+        slowest_requests=profiler.slowest(),
+    )
+
+
+@router.get("/profiling", response_model=ProfilingStatus)
+async def get_profiling(owner: str = Depends(_require_user)):
+    return _status()
+
+
+@router.put("/profiling", response_model=ProfilingStatus)
+async def set_profiling(body: ProfilingConfig, owner: str = Depends(_require_user)):
+    if body.slow_request_ms is not None:
+        profiler.slow_request_ms = body.slow_request_ms
+    if body.enabled:
+        profiler.enable()
+    else:
+        profiler.disable()
+    return _status()
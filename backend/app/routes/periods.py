@@ -2,12 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import verify_api_key
-from app.database import get_db
-from app.schemas import PeriodCreate, PeriodEnd, PeriodResponse, PeriodStats, PeriodUpdate
+from app.database import db_session, get_db
+from app.schemas import (
+    PeriodAnalytics,
+    PeriodCreate,
+    PeriodEnd,
+    PeriodResponse,
+    PeriodStats,
+    PeriodUpdate,
+)
 from app.services.period_service import (
+    PeriodArchivedError,
     create_period,
     delete_period,
     end_period,
+    get_analytics,
+    get_cached_analytics,
+    get_cached_stats,
     get_stats,
     list_periods,
     update_period,
@@ -52,6 +63,8 @@ async def patch_period(
     _reject_demo(owner)
     try:
         return await end_period(db, period_id, body.end_date, owner)
+    except PeriodArchivedError:
+        raise HTTPException(status_code=409, detail="Period is archived and read-only")
     except LookupError:
         raise HTTPException(status_code=404, detail="Period not found")
     except ValueError:
@@ -68,6 +81,8 @@ async def put_period(
     _reject_demo(owner)
     try:
         return await update_period(db, period_id, body.start_date, body.end_date, owner)
+    except PeriodArchivedError:
+        raise HTTPException(status_code=409, detail="Period is archived and read-only")
     except LookupError:
         raise HTTPException(status_code=404, detail="Period not found")
     except ValueError:
@@ -83,13 +98,26 @@ async def remove_period(
     _reject_demo(owner)
     try:
         await delete_period(db, period_id, owner)
+    except PeriodArchivedError:
+        raise HTTPException(status_code=409, detail="Period is archived and read-only")
     except LookupError:
         raise HTTPException(status_code=404, detail="Period not found")
 
 
 @router.get("/stats", response_model=PeriodStats)
-async def period_stats(
-    db: AsyncSession = Depends(get_db),
-    owner: str = Depends(verify_api_key),
-):
-    return await get_stats(db, owner)
+async def period_stats(owner: str = Depends(verify_api_key)):
+    # Serve cache hits without taking a DB slot so they keep flowing under load.
+    cached = get_cached_stats(owner)
+    if cached is not None:
+        return cached
+    async with db_session() as db:
+        return await get_stats(db, owner)
+
+
+@router.get("/analytics", response_model=PeriodAnalytics)
+async def period_analytics(owner: str = Depends(verify_api_key)):
+    cached = get_cached_analytics(owner)
+    if cached is not None:
+        return cached
+    async with db_session() as db:
+        return await get_analytics(db, owner)
@@ -21,6 +21,7 @@ class PeriodResponse(BaseModel):
     start_date: date
     end_date: date | None
     created_at: datetime
+    archived: bool = False
 
     model_config = {"from_attributes": True}
 
@@ -32,3 +33,35 @@ class PeriodStats(BaseModel):
     predicted_next_start: date | None
     predicted_cycle_length_days: int | None
     predicted_period_length_days: int | None
+
+
+class HistogramBin(BaseModel):
+    days: int
+    count: int
+
+
+class RollingAverage(BaseModel):
+    window: int
+    values: list[float]
+
+
+class PeriodAnalytics(BaseModel):
+    cycle_count: int
+    cycle_length_mean: float | None
+    cycle_length_std_dev: float | None
+    period_length_mean: float | None
+    period_length_std_dev: float | None
+    rolling_cycle_averages: list[RollingAverage]
+    cycle_length_histogram: list[HistogramBin]
+    period_length_histogram: list[HistogramBin]
+
+
+class ProfilingConfig(BaseModel):
+    enabled: bool
+    slow_request_ms: int | None = None
+
+
+class ProfilingStatus(BaseModel):
+    enabled: bool
+    slow_request_ms: int
+    slowest_requests: list[dict]
@@ -0,0 +1,119 @@
+import datetime
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ArchiveSummary
+from app.services.period_service import (
+    MAX_PREDICTION_CYCLE_GAP_DAYS,
+    _archive_model,
+    _model,
+)
+
+OWNERS = ("user", "demo")
+
+
+async def lock_owner_archive(db: AsyncSession, owner: str) -> None:
+    """Serialise archive moves and summary rebuilds for owner until commit."""
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"archive:{owner}"))))
+
+
+def _fold_into_summary(summary: ArchiveSummary, periods: list[tuple]) -> None:
+    """Add completed (start_date, end_date) pairs, oldest first and all newer
+    than the summary, to it."""
+    for start_date, end_date in periods:
+        if summary.last_start_date is not None:
+            gap = (start_date - summary.last_start_date).days
+            if 0 < gap < MAX_PREDICTION_CYCLE_GAP_DAYS:
+                summary.cycle_count += 1
+                summary.cycle_weighted_sum += gap * summary.cycle_count
+        summary.period_count += 1
+        summary.length_weighted_sum += ((end_date - start_date).days + 1) * summary.period_count
+        summary.last_start_date = start_date
+        summary.last_end_date = end_date
+
+
+async def archive_periods(
+    db: AsyncSession, owner: str, cutoff: datetime.date, batch_size: int = 500
+) -> int:
+    """Move the owner's completed periods starting before cutoff to the cold table.
+
+    Works in batches, oldest first, each in its own transaction that also
+    folds the batch into the owner's ArchiveSummary, so get_stats returns
+    the same result before and after. Returns the number of rows moved.
+
+    Normally run from archive_periods.py, outside the API process. The API
+    needs no invalidation: stats are unchanged by design, its interval
+    index drops moved rows within interval_index_max_age_seconds, and the
+    archive boundary is read from the DB on each write.
+    """
+    M = _model(owner)
+    A = _archive_model(owner)
+    moved = 0
+
+    while True:
+        await lock_owner_archive(db, owner)
+        result = await db.execute(
+            select(M)
+            .where(M.start_date < cutoff, M.end_date.is_not(None))
+            .order_by(M.start_date.asc())
+            .limit(batch_size)
+            .with_for_update()
+        )
+        batch = list(result.scalars().all())
+        if not batch:
+            await db.commit()
+            break
+
+        summary = await db.get(ArchiveSummary, owner, with_for_update=True)
+        if summary is None:
+            summary = ArchiveSummary(
+                owner=owner, period_count=0, length_weighted_sum=0, cycle_count=0, cycle_weighted_sum=0
+            )
+            db.add(summary)
+        _fold_into_summary(summary, [(p.start_date, p.end_date) for p in batch])
+
+        await db.execute(
+            insert(A),
+            [
+                {"id": p.id, "start_date": p.start_date, "end_date": p.end_date, "created_at": p.created_at}
+                for p in batch
+            ],
+        )
+        await db.execute(delete(M).where(M.id.in_([p.id for p in batch])))
+        await db.commit()
+        moved += len(batch)
+
+    return moved
+
+
+async def rebuild_summary(db: AsyncSession, owner: str) -> ArchiveSummary | None:
+    """Recompute the owner's ArchiveSummary from the cold table.
+
+    Needed whenever the aggregation itself changes, e.g. a new
+    MAX_PREDICTION_CYCLE_GAP_DAYS.
+    """
+    A = _archive_model(owner)
+    await lock_owner_archive(db, owner)
+    result = await db.execute(select(A).order_by(A.start_date.asc()))
+    archived = list(result.scalars().all())
+
+    summary = await db.get(ArchiveSummary, owner, with_for_update=True)
+    if not archived:
+        if summary is not None:
+            await db.delete(summary)
+            await db.commit()
+        return None
+
+    if summary is None:
+        summary = ArchiveSummary(owner=owner)
+        db.add(summary)
+    summary.period_count = 0
+    summary.length_weighted_sum = 0
+    summary.cycle_count = 0
+    summary.cycle_weighted_sum = 0
+    summary.last_start_date = None
+    summary.last_end_date = None
+    _fold_into_summary(summary, [(p.start_date, p.end_date) for p in archived])
+    await db.commit()
+    return summary
@@ -0,0 +1,89 @@
+import datetime
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+# Open periods extend to infinity.
+OPEN_END = datetime.date.max.toordinal()
+
+
+class IntervalIndex:
+    """Sorted, array-backed [start, end] date ordinals for one owner.
+
+    Periods never overlap, so ordering by start also orders by end and an
+    overlap query only needs to look at the interval just before the query's
+    end. Also tracks open periods so the write path can check for one
+    without touching the DB.
+    """
+
+    def __init__(self, rows: list[tuple]):
+        rows = sorted(rows, key=lambda r: r[1])
+        self.ids = array("q", (r[0] for r in rows))
+        self.starts = array("i", (r[1].toordinal() for r in rows))
+        self.ends = array("i", (OPEN_END if r[2] is None else r[2].toordinal() for r in rows))
+        self.open_ids = {r[0] for r in rows if r[2] is None}
+        self.built_at = time.monotonic()
+
+    def has_open(self) -> bool:
+        return bool(self.open_ids)
+
+    def overlaps(
+        self, start: datetime.date, end: datetime.date | None, exclude_id: int | None = None
+    ) -> bool:
+        start_ord = start.toordinal()
+        end_ord = OPEN_END if end is None else end.toordinal()
+        # Last interval starting on or before our end; walk back past the
+        # excluded one (at most one step) to the nearest real neighbour.
+        i = bisect_right(self.starts, end_ord) - 1
+        while i >= 0 and self.ids[i] == exclude_id:
+            i -= 1
+        return i >= 0 and self.ends[i] >= start_ord
+
+    def add(self, period_id: int, start: datetime.date, end: datetime.date | None) -> None:
+        start_ord = start.toordinal()
+        i = bisect_left(self.starts, start_ord)
+        self.ids.insert(i, period_id)
+        self.starts.insert(i, start_ord)
+        self.ends.insert(i, OPEN_END if end is None else end.toordinal())
+        if end is None:
+            self.open_ids.add(period_id)
+
+    def remove(self, period_id: int) -> None:
+        try:
+            i = self.ids.index(period_id)
+        except ValueError:
+            return
+        del self.ids[i]
+        del self.starts[i]
+        del self.ends[i]
+        self.open_ids.discard(period_id)
+
+
+class IntervalIndexCache:
+    """LRU of per-owner IntervalIndex, each rebuilt after ``max_age`` seconds
+    to bound staleness from writers outside this process."""
+
+    def __init__(self, max_owners: int, max_age: float):
+        self.max_owners = max_owners
+        self.max_age = max_age
+        self._indexes: OrderedDict[str, IntervalIndex] = OrderedDict()
+
+    def get(self, owner: str) -> IntervalIndex | None:
+        index = self._indexes.get(owner)
+        if index is None:
+            return None
+        if time.monotonic() - index.built_at > self.max_age:
+            del self._indexes[owner]
+            return None
+        self._indexes.move_to_end(owner)
+        return index
+
+    def put(self, owner: str, index: IntervalIndex) -> None:
+        self._indexes[owner] = index
+        self._indexes.move_to_end(owner)
+        while len(self._indexes) > self.max_owners:
+            self._indexes.popitem(last=False)
+
+    def discard(self, owner: str) -> None:
+        self._indexes.pop(owner, None)
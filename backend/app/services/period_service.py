@@ -1,12 +1,17 @@
 import datetime
+import math
 import time
+from collections import Counter
+from collections.abc import Callable
 
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import DemoPeriod, Period
-from app.schemas import PeriodStats
+from app.config import settings
+from app.models import ArchiveSummary, DemoPeriod, DemoPeriodArchive, Period, PeriodArchive
+from app.schemas import HistogramBin, PeriodAnalytics, PeriodStats, RollingAverage
+from app.services.interval_index import IntervalIndex, IntervalIndexCache
 
 MAX_DATE_RANGE_YEARS = 10
 MAX_PREDICTION_CYCLE_GAP_DAYS = 50
@@ -15,11 +20,36 @@ MAX_PREDICTION_CYCLE_GAP_DAYS = 50
 _stats_cache: dict[str, dict[str, object]] = {}
 _STATS_TTL_SECONDS = 30
 
+# Bumped on every mutation in this process. Analytics are cached per
+# (owner, version); the TTL is a backstop for writes made by other
+# processes (other workers, archive_periods.py), which can't bump it.
+_data_versions: dict[str, int] = {}
+_invalidation_listeners: list[Callable[[str], None]] = []
+# { owner: (version, expires_at, value) }
+_analytics_cache: dict[str, tuple[int, float, PeriodAnalytics]] = {}
+_ANALYTICS_TTL_SECONDS = 300
+ROLLING_WINDOWS = (3, 6, 12)
+
+# Per-owner sorted interval index used for write-path validation; the
+# periods_no_overlap exclusion constraint remains the final guard.
+_interval_indexes = IntervalIndexCache(
+    max_owners=settings.interval_index_max_owners,
+    max_age=settings.interval_index_max_age_seconds,
+)
+
+
+class PeriodArchivedError(Exception):
+    """Raised when a write targets a period that has been archived."""
+
 
 def _model(owner: str):
     return DemoPeriod if owner == "demo" else Period
 
 
+def _archive_model(owner: str):
+    return DemoPeriodArchive if owner == "demo" else PeriodArchive
+
+
 def _validate_date_range(d: datetime.date) -> None:
     today = datetime.date.today()
     lower = today - datetime.timedelta(days=MAX_DATE_RANGE_YEARS * 365)
@@ -28,44 +58,104 @@ def _validate_date_range(d: datetime.date) -> None:
         raise ValueError(f"Date must be between {lower} and {upper}")
 
 
-async def _check_overlap(
-    db: AsyncSession,
+async def _interval_index(db: AsyncSession, owner: str) -> IntervalIndex:
+    """Return the owner's interval index, building it from the DB on a miss."""
+    index = _interval_indexes.get(owner)
+    if index is None:
+        M = _model(owner)
+        version = _data_versions.get(owner, 0)
+        result = await db.execute(select(M.id, M.start_date, M.end_date))
+        index = IntervalIndex([tuple(row) for row in result.all()])
+        # A write that committed during the SELECT found no index to update,
+        # so this build may already be stale; use it once but don't cache it.
+        if _data_versions.get(owner, 0) == version:
+            _interval_indexes.put(owner, index)
+    return index
+
+
+def _reindex(owner: str, period) -> None:
+    """Reflect a committed insert/update in the owner's index, if loaded."""
+    index = _interval_indexes.get(owner)
+    if index is not None:
+        # Remove first: the index may have been built after this commit.
+        index.remove(period.id)
+        index.add(period.id, period.start_date, period.end_date)
+
+
+async def _get_period(db: AsyncSession, period_id: int, owner: str):
+    """Fetch a hot period for writing; archived ones are read-only."""
+    M = _model(owner)
+    result = await db.execute(
+        select(M).where(M.id == period_id)
+    )
+    period = result.scalar_one_or_none()
+    if period is not None:
+        return period
+    if await db.get(_archive_model(owner), period_id) is not None:
+        raise PeriodArchivedError("Period is archived and read-only")
+    raise LookupError("Period not found")
+
+
+async def _check_not_archived(db: AsyncSession, start_date: datetime.date, owner: str) -> None:
+    """Raise ValueError if start_date falls within the owner's archived history.
+
+    Archived periods are read-only; allowing writes before the archive
+    boundary would break the ordering the archive summary relies on. Read
+    from the DB on every write (a primary-key lookup) because archiving
+    happens in another process and would leave a cached boundary stale.
+    """
+    summary = await db.get(ArchiveSummary, owner)
+    if summary is not None and summary.last_end_date is not None and start_date <= summary.last_end_date:
+        raise ValueError("Date falls within archived history")
+
+
+def _check_overlap(
+    index: IntervalIndex,
     start_date: datetime.date,
     end_date: datetime.date | None,
-    owner: str,
     exclude_id: int | None = None,
 ) -> None:
     """Raise ValueError if the given range overlaps any existing period."""
-    M = _model(owner)
-    effective_end = end_date if end_date is not None else datetime.date.max
-    # A overlaps B when A.start <= B.end AND A.end >= B.start
-    conditions = [
-        M.start_date <= effective_end,
-    ]
-    # For periods with NULL end_date (open), they extend to infinity
-    # so they always satisfy "existing.end >= start_date".
-    # For periods with an end_date, check normally.
-    conditions.append(
-        (M.end_date >= start_date) | (M.end_date.is_(None))
-    )
-    if exclude_id is not None:
-        conditions.append(M.id != exclude_id)
-    result = await db.execute(select(M.id).where(and_(*conditions)).limit(1))
-    if result.scalar_one_or_none() is not None:
+    if index.overlaps(start_date, end_date, exclude_id):
         raise ValueError("Date range overlaps with an existing period")
 
 
+def on_stats_invalidated(listener: Callable[[str], None]) -> None:
+    """Register listener(owner), called whenever an owner's data changes."""
+    _invalidation_listeners.append(listener)
+
+
 def _invalidate_stats_cache(owner: str) -> None:
     _stats_cache.pop(owner, None)
+    _data_versions[owner] = _data_versions.get(owner, 0) + 1
+    for listener in _invalidation_listeners:
+        listener(owner)
 
 
-def _weighted_average(values: list[int]) -> float | None:
-    if not values:
+def get_cached_stats(owner: str) -> PeriodStats | None:
+    """Return a fresh cached PeriodStats for owner without touching the DB."""
+    cached = _stats_cache.get(owner)
+    if cached is not None and cached["value"] is not None and time.monotonic() < cached["expires_at"]:
+        return cached["value"]
+    return None
+
+
+def _weighted_average(
+    values: list[int], prior_count: int = 0, prior_weighted_sum: int = 0
+) -> float | None:
+    """Linearly weighted average, most recent value weighted heaviest.
+
+    prior_count/prior_weighted_sum carry older values that are no longer in
+    `values` (e.g. archived periods), as `sum(value_i * i)` over those
+    values, so the result is identical to passing the full list.
+    """
+    count = prior_count + len(values)
+    if count == 0:
         return None
 
-    weights = range(1, len(values) + 1)
-    weighted_total = sum(value * weight for value, weight in zip(values, weights))
-    return round(weighted_total / sum(weights), 1)
+    weights = range(prior_count + 1, count + 1)
+    weighted_total = prior_weighted_sum + sum(value * weight for value, weight in zip(values, weights))
+    return round(weighted_total / (count * (count + 1) // 2), 1)
 
 
 def _rounded_prediction_days(value: float | None) -> int | None:
@@ -76,25 +166,30 @@ def _rounded_prediction_days(value: float | None) -> int | None:
 
 async def list_periods(db: AsyncSession, owner: str) -> list:
     M = _model(owner)
+    A = _archive_model(owner)
     result = await db.execute(
         select(M).order_by(M.start_date.desc())
     )
-    return list(result.scalars().all())
+    periods = list(result.scalars().all())
+    # Archived periods are all older than any hot period.
+    archived = await db.execute(
+        select(A).order_by(A.start_date.desc())
+    )
+    return periods + list(archived.scalars().all())
 
 
 async def create_period(db: AsyncSession, start_date: datetime.date, owner: str):
     M = _model(owner)
     _validate_date_range(start_date)
 
+    index = await _interval_index(db, owner)
+
     # Check no open period exists
-    result = await db.execute(
-        select(M).where(M.end_date.is_(None))
-    )
-    open_period = result.scalar_one_or_none()
-    if open_period:
+    if index.has_open():
         raise ValueError("An open period already exists. End it before starting a new one.")
 
-    await _check_overlap(db, start_date, None, owner)
+    await _check_not_archived(db, start_date, owner)
+    _check_overlap(index, start_date, None)
 
     period = M(start_date=start_date)
     db.add(period)
@@ -102,32 +197,35 @@ async def create_period(db: AsyncSession, start_date: datetime.date, owner: str)
         await db.commit()
     except IntegrityError:
         await db.rollback()
+        _interval_indexes.discard(owner)
         raise ValueError("A period with this start date already exists")
     await db.refresh(period)
+    _reindex(owner, period)
     _invalidate_stats_cache(owner)
     return period
 
 
 async def end_period(db: AsyncSession, period_id: int, end_date: datetime.date, owner: str):
-    M = _model(owner)
     _validate_date_range(end_date)
 
-    result = await db.execute(
-        select(M).where(M.id == period_id)
-    )
-    period = result.scalar_one_or_none()
-    if not period:
-        raise LookupError("Period not found")
+    period = await _get_period(db, period_id, owner)
     if period.end_date is not None:
         raise ValueError("Period is already ended")
     if end_date < period.start_date:
         raise ValueError("end_date must be >= start_date")
 
-    await _check_overlap(db, period.start_date, end_date, owner, exclude_id=period_id)
+    index = await _interval_index(db, owner)
+    _check_overlap(index, period.start_date, end_date, exclude_id=period_id)
 
     period.end_date = end_date
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        _interval_indexes.discard(owner)
+        raise ValueError("Date range overlaps with an existing period")
     await db.refresh(period)
+    _reindex(owner, period)
     _invalidate_stats_cache(owner)
     return period
 
@@ -139,21 +237,17 @@ async def update_period(
     end_date: datetime.date | None,
     owner: str,
 ):
-    M = _model(owner)
     _validate_date_range(start_date)
     if end_date is not None:
         _validate_date_range(end_date)
 
-    result = await db.execute(
-        select(M).where(M.id == period_id)
-    )
-    period = result.scalar_one_or_none()
-    if not period:
-        raise LookupError("Period not found")
+    period = await _get_period(db, period_id, owner)
     if end_date is not None and end_date < start_date:
         raise ValueError("end_date must be >= start_date")
 
-    await _check_overlap(db, start_date, end_date, owner, exclude_id=period_id)
+    index = await _interval_index(db, owner)
+    await _check_not_archived(db, start_date, owner)
+    _check_overlap(index, start_date, end_date, exclude_id=period_id)
 
     period.start_date = start_date
     period.end_date = end_date
@@ -161,77 +255,177 @@ async def update_period(
         await db.commit()
     except IntegrityError:
         await db.rollback()
+        _interval_indexes.discard(owner)
         raise ValueError("A period with this start date already exists")
     await db.refresh(period)
+    _reindex(owner, period)
     _invalidate_stats_cache(owner)
     return period
 
 
 async def delete_period(db: AsyncSession, period_id: int, owner: str) -> None:
-    M = _model(owner)
-    result = await db.execute(
-        select(M).where(M.id == period_id)
-    )
-    period = result.scalar_one_or_none()
-    if not period:
-        raise LookupError("Period not found")
+    period = await _get_period(db, period_id, owner)
     await db.delete(period)
     await db.commit()
+    index = _interval_indexes.get(owner)
+    if index is not None:
+        index.remove(period_id)
     _invalidate_stats_cache(owner)
 
 
-async def get_stats(db: AsyncSession, owner: str) -> PeriodStats:
-    M = _model(owner)
-    now = time.monotonic()
-    cached = _stats_cache.get(owner)
-    if cached is not None and cached["value"] is not None and now < cached["expires_at"]:
-        return cached["value"]
-
-    result = await db.execute(
-        select(M).order_by(M.start_date.asc())
-    )
-    periods = list(result.scalars().all())
+def compute_stats(periods: list[tuple], summary: ArchiveSummary | None) -> dict:
+    """Averages and predictions from (start_date, end_date) pairs in start order.
 
-    # Current open period
-    current = next((p for p in periods if p.end_date is None), None)
+    Returns the PeriodStats fields other than current_period.
+    """
+    # Aggregates of archived periods, which precede every hot period
+    archived_lengths = (summary.period_count, summary.length_weighted_sum) if summary else (0, 0)
+    archived_cycles = (summary.cycle_count, summary.cycle_weighted_sum) if summary else (0, 0)
 
     # Average period length (completed only)
-    completed = [p for p in periods if p.end_date is not None]
-    avg_period_length = None
-    if completed:
-        lengths = [(p.end_date - p.start_date).days + 1 for p in completed]
-        avg_period_length = _weighted_average(lengths)
+    lengths = [(end - start).days + 1 for start, end in periods if end is not None]
+    avg_period_length = _weighted_average(lengths, *archived_lengths)
     predicted_period_length_days = _rounded_prediction_days(avg_period_length)
-    if predicted_period_length_days is None and periods:
+    if predicted_period_length_days is None and (periods or summary):
         predicted_period_length_days = 5
 
     # Average cycle length (gap between consecutive period starts),
     # excluding large outlier gaps and weighting recent cycles more heavily.
-    avg_cycle_length = None
-    if len(periods) >= 2:
-        cycles = []
-        for i in range(len(periods) - 1):
-            gap = (periods[i + 1].start_date - periods[i].start_date).days
-            if 0 < gap < MAX_PREDICTION_CYCLE_GAP_DAYS:
-                cycles.append(gap)
-        avg_cycle_length = _weighted_average(cycles)
+    # The last archived start bridges the gap into the first hot period.
+    starts = [start for start, _ in periods]
+    if summary is not None and summary.last_start_date is not None:
+        starts.insert(0, summary.last_start_date)
+    cycles = []
+    for i in range(len(starts) - 1):
+        gap = (starts[i + 1] - starts[i]).days
+        if 0 < gap < MAX_PREDICTION_CYCLE_GAP_DAYS:
+            cycles.append(gap)
+    avg_cycle_length = _weighted_average(cycles, *archived_cycles)
     predicted_cycle_length_days = _rounded_prediction_days(avg_cycle_length)
 
     # Predicted next start
     predicted = None
-    if predicted_cycle_length_days is not None and periods:
-        last_start = periods[-1].start_date
+    if predicted_cycle_length_days is not None and starts:
+        last_start = starts[-1]
         predicted = last_start + datetime.timedelta(days=predicted_cycle_length_days)
 
+    return {
+        "average_cycle_length": avg_cycle_length,
+        "average_period_length": avg_period_length,
+        "predicted_next_start": predicted,
+        "predicted_cycle_length_days": predicted_cycle_length_days,
+        "predicted_period_length_days": predicted_period_length_days,
+    }
+
+
+async def get_stats(db: AsyncSession, owner: str) -> PeriodStats:
+    M = _model(owner)
+    cached = get_cached_stats(owner)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(M).order_by(M.start_date.asc())
+    )
+    periods = list(result.scalars().all())
+    summary = await db.get(ArchiveSummary, owner)
+
+    # Current open period
+    current = next((p for p in periods if p.end_date is None), None)
+
     stats = PeriodStats(
-        average_cycle_length=avg_cycle_length,
-        average_period_length=avg_period_length,
         current_period=current,
-        predicted_next_start=predicted,
-        predicted_cycle_length_days=predicted_cycle_length_days,
-        predicted_period_length_days=predicted_period_length_days,
+        **compute_stats([(p.start_date, p.end_date) for p in periods], summary),
     )
 
-    _stats_cache[owner] = {"value": stats, "expires_at": now + _STATS_TTL_SECONDS}
+    _stats_cache[owner] = {"value": stats, "expires_at": time.monotonic() + _STATS_TTL_SECONDS}
 
     return stats
+
+
+def get_cached_analytics(owner: str) -> PeriodAnalytics | None:
+    """Return cached analytics if unexpired and no local mutation has happened since."""
+    cached = _analytics_cache.get(owner)
+    if cached is None:
+        return None
+    version, expires_at, value = cached
+    if version == _data_versions.get(owner, 0) and time.monotonic() < expires_at:
+        return value
+    return None
+
+
+def _mean_and_std_dev(count: int, total: int, total_sq: int) -> tuple[float | None, float | None]:
+    if count == 0:
+        return None, None
+    # Integer sums keep the population variance exact until the final division.
+    variance = (count * total_sq - total * total) / (count * count)
+    return round(total / count, 1), round(math.sqrt(variance), 1)
+
+
+def _histogram(counts: Counter) -> list[HistogramBin]:
+    return [HistogramBin(days=days, count=n) for days, n in sorted(counts.items())]
+
+
+async def get_analytics(db: AsyncSession, owner: str) -> PeriodAnalytics:
+    """Cycle regularity over the owner's full history, archived periods included.
+
+    Cycle gaps use the same outlier filter as get_stats. Everything is
+    accumulated in a single pass over (start, end) pairs in start order.
+    """
+    cached = get_cached_analytics(owner)
+    if cached is not None:
+        return cached
+    version = _data_versions.get(owner, 0)
+
+    M = _model(owner)
+    A = _archive_model(owner)
+    archived = await db.execute(select(A.start_date, A.end_date).order_by(A.start_date.asc()))
+    hot = await db.execute(select(M.start_date, M.end_date).order_by(M.start_date.asc()))
+    rows = list(archived.all()) + list(hot.all())
+
+    cycle_n = cycle_sum = cycle_sq = 0
+    length_n = length_sum = length_sq = 0
+    cycle_hist: Counter[int] = Counter()
+    length_hist: Counter[int] = Counter()
+    prefix = [0]  # running cycle totals, for O(1) rolling windows
+    rolling: dict[int, list[float]] = {w: [] for w in ROLLING_WINDOWS}
+
+    prev_start = None
+    for start_date, end_date in rows:
+        if end_date is not None:
+            length = (end_date - start_date).days + 1
+            length_n += 1
+            length_sum += length
+            length_sq += length * length
+            length_hist[length] += 1
+
+        if prev_start is not None:
+            gap = (start_date - prev_start).days
+            if 0 < gap < MAX_PREDICTION_CYCLE_GAP_DAYS:
+                cycle_n += 1
+                cycle_sum += gap
+                cycle_sq += gap * gap
+                cycle_hist[gap] += 1
+                prefix.append(prefix[-1] + gap)
+                for w in ROLLING_WINDOWS:
+                    if cycle_n >= w:
+                        rolling[w].append(round((prefix[-1] - prefix[-1 - w]) / w, 1))
+        prev_start = start_date
+
+    cycle_mean, cycle_std_dev = _mean_and_std_dev(cycle_n, cycle_sum, cycle_sq)
+    length_mean, length_std_dev = _mean_and_std_dev(length_n, length_sum, length_sq)
+
+    analytics = PeriodAnalytics(
+        cycle_count=cycle_n,
+        cycle_length_mean=cycle_mean,
+        cycle_length_std_dev=cycle_std_dev,
+        period_length_mean=length_mean,
+        period_length_std_dev=length_std_dev,
+        rolling_cycle_averages=[RollingAverage(window=w, values=rolling[w]) for w in ROLLING_WINDOWS],
+        cycle_length_histogram=_histogram(cycle_hist),
+        period_length_histogram=_histogram(length_hist),
+    )
+
+    _analytics_cache[owner] = (version, time.monotonic() + _ANALYTICS_TTL_SECONDS, analytics)
+
+    return analytics
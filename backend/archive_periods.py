@@ -0,0 +1,37 @@
+"""Move old completed periods into the archive tables.
+
+Periods starting before the horizon are moved out of the hot tables and
+folded into per-owner summaries, so stats and predictions are unchanged.
+
+Usage:
+    uv run archive_periods.py [--years N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import datetime
+
+from app.config import settings
+from app.database import async_session, engine
+from app.services.archive_service import OWNERS, archive_periods
+
+
+async def run(args) -> None:
+    cutoff = datetime.date.today() - datetime.timedelta(days=args.years * 365)
+    for owner in OWNERS:
+        async with async_session() as db:
+            moved = await archive_periods(db, owner, cutoff, args.batch_size)
+            print(f"{owner}: archived {moved} periods starting before {cutoff}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old periods")
+    parser.add_argument("--years", type=int, default=settings.archive_horizon_years)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
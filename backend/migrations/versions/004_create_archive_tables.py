@@ -0,0 +1,50 @@
+"""create archive tables and per-owner archive summaries
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("periods_archive", "demo_periods_archive"):
+        op.create_table(
+            table,
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("start_date", sa.Date(), nullable=False),
+            sa.Column("end_date", sa.Date(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    op.create_table(
+        "archive_summaries",
+        sa.Column("owner", sa.String(), primary_key=True),
+        sa.Column("period_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("length_weighted_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("cycle_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cycle_weighted_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("last_start_date", sa.Date(), nullable=True),
+        sa.Column("last_end_date", sa.Date(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    # Move archived rows back so downgrading never loses history.
+    for hot, cold in (("periods", "periods_archive"), ("demo_periods", "demo_periods_archive")):
+        op.execute(
+            f"INSERT INTO {hot} (id, start_date, end_date, created_at) "
+            f"SELECT id, start_date, end_date, created_at FROM {cold}"
+        )
+    op.drop_table("archive_summaries")
+    op.drop_table("demo_periods_archive")
+    op.drop_table("periods_archive")
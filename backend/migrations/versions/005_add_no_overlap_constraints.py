@@ -0,0 +1,65 @@
+"""add exclusion constraints preventing overlapping periods
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.online_migrations import add_exclusion_constraint
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A NULL end_date gives an unbounded range, matching an open period.
+TABLES = {
+    "periods": "periods_no_overlap",
+    "demo_periods": "demo_periods_no_overlap",
+}
+RANGE = "daterange({0}start_date, {0}end_date, '[]')"
+
+
+def _check_no_overlaps(table: str) -> None:
+    """Fail with the offending rows rather than a bare constraint error.
+
+    Rows written before this constraint went through a check-then-insert
+    that could race, so overlaps are possible and must be fixed by hand.
+    """
+    rows = op.get_bind().execute(
+        sa.text(
+            f"SELECT a.id, a.start_date, a.end_date, b.id, b.start_date, b.end_date "
+            f"FROM {table} a JOIN {table} b ON a.id < b.id "
+            f"AND {RANGE.format('a.')} && {RANGE.format('b.')} "
+            "ORDER BY a.start_date LIMIT 20"
+        )
+    ).all()
+    if rows:
+        pairs = "\n".join(
+            f"  id {a_id} ({a_start}..{a_end or 'open'}) overlaps "
+            f"id {b_id} ({b_start}..{b_end or 'open'})"
+            for a_id, a_start, a_end, b_id, b_start, b_end in rows
+        )
+        raise RuntimeError(
+            f"Cannot add {TABLES[table]}: {table} has overlapping periods. "
+            f"Fix or delete these rows, then rerun the migration:\n{pairs}"
+        )
+
+
+def upgrade() -> None:
+    # Both tables hold one person's history (hundreds of rows at most), so
+    # the brief ACCESS EXCLUSIVE lock while the gist index builds is fine.
+    for table in TABLES:
+        _check_no_overlaps(table)
+    for table, name in TABLES.items():
+        add_exclusion_constraint(name, table, f"USING gist ({RANGE.format('')} WITH &&)")
+
+
+def downgrade() -> None:
+    for table, name in TABLES.items():
+        op.drop_constraint(name, table)
@@ -0,0 +1,46 @@
+"""Recompute the archive summaries that get_stats builds on, for every owner.
+
+Run after changing anything that feeds get_stats (e.g.
+MAX_PREDICTION_CYCLE_GAP_DAYS or the weighting). Stats for hot periods are
+always computed live, so the persisted archive summaries are the only
+derived state that goes stale; the API picks up the rebuilt summaries
+within its stats cache TTL. Safe to run while the API is serving traffic.
+
+Usage:
+    uv run rebuild_stats.py
+"""
+
+import asyncio
+import time
+
+from app.database import async_session, engine
+from app.services.archive_service import OWNERS, rebuild_summary
+
+
+async def run() -> None:
+    started = time.monotonic()
+    periods_done = 0
+    for owner in OWNERS:
+        async with async_session() as db:
+            summary = await rebuild_summary(db, owner)
+        count = summary.period_count if summary else 0
+        periods_done += count
+        elapsed = time.monotonic() - started
+        print(
+            f"{owner}: rebuilt summary over {count} archived periods "
+            f"({periods_done / elapsed:.0f} periods/s so far)"
+        )
+    elapsed = time.monotonic() - started
+    print(
+        f"Done: {len(OWNERS)} owners, {periods_done} periods in {elapsed:.1f}s "
+        f"({len(OWNERS) / elapsed:.1f} owners/s, {periods_done / elapsed:.0f} periods/s)"
+    )
+    await engine.dispose()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
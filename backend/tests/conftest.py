@@ -0,0 +1,73 @@
+import pytest
+
+from app.models import ArchiveSummary
+from app.services import period_service
+
+
+class FakeResult:
+    def __init__(self, value, rows):
+        self.value = value
+        self.rows = rows
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def all(self):
+        return list(self.rows)
+
+
+class FakeSession:
+    """Just enough of AsyncSession for the period write path.
+
+    Every SELECT returns ``hot`` as its scalar and ``rows`` as its rows
+    (what an interval index build sees); ``get`` returns ``summary`` for
+    ArchiveSummary and ``archived`` for anything else.
+    """
+
+    def __init__(
+        self, hot=None, archived=None, summary: ArchiveSummary | None = None, rows: tuple = ()
+    ):
+        self.hot = hot
+        self.rows = rows
+        self.archived = archived
+        self.summary = summary
+        self.added = []
+        self.commits = 0
+        self._next_id = 1000
+
+    async def execute(self, statement):
+        return FakeResult(self.hot, self.rows)
+
+    async def get(self, model, key):
+        return self.summary if model is ArchiveSummary else self.archived
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, obj):
+        if obj.id is None:
+            obj.id = self._next_id
+            self._next_id += 1
+
+    async def delete(self, obj):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def clear_service_caches():
+    yield
+    period_service._interval_indexes._indexes.clear()
+    period_service._stats_cache.clear()
+    period_service._analytics_cache.clear()
+    period_service._data_versions.clear()
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
@@ -0,0 +1,132 @@
+import asyncio
+import datetime
+import random
+import statistics
+from collections import Counter
+
+import pytest
+
+from app.services import period_service
+from app.services.period_service import (
+    MAX_PREDICTION_CYCLE_GAP_DAYS,
+    ROLLING_WINDOWS,
+    _invalidate_stats_cache,
+    get_analytics,
+    get_cached_analytics,
+)
+
+
+def _history(n: int, seed: int) -> list[tuple[datetime.date, datetime.date | None]]:
+    rng = random.Random(seed)
+    start = datetime.date(2010, 1, 1)
+    periods = []
+    for _ in range(n):
+        end = start + datetime.timedelta(days=rng.randint(2, 8))
+        periods.append((start, end))
+        # Occasionally a gap long enough to hit the outlier filter
+        start += datetime.timedelta(days=rng.choice([rng.randint(21, 35), 60]))
+    if periods:
+        periods[-1] = (periods[-1][0], None)
+    return periods
+
+
+def _expected(periods):
+    """The same analytics computed the obvious way."""
+    lengths = [(end - start).days + 1 for start, end in periods if end is not None]
+    gaps = [(b[0] - a[0]).days for a, b in zip(periods, periods[1:])]
+    cycles = [gap for gap in gaps if 0 < gap < MAX_PREDICTION_CYCLE_GAP_DAYS]
+
+    def mean_and_std_dev(values):
+        if not values:
+            return None, None
+        return round(statistics.fmean(values), 1), round(statistics.pstdev(values), 1)
+
+    rolling = {
+        w: [round(statistics.fmean(cycles[i - w:i]), 1) for i in range(w, len(cycles) + 1)]
+        for w in ROLLING_WINDOWS
+    }
+    return {
+        "cycle_count": len(cycles),
+        "cycle": mean_and_std_dev(cycles),
+        "length": mean_and_std_dev(lengths),
+        "rolling": rolling,
+        "cycle_hist": dict(Counter(cycles)),
+        "length_hist": dict(Counter(lengths)),
+    }
+
+
+class SplitSession:
+    """Serves the archived rows to the first SELECT and the hot rows to the second."""
+
+    def __init__(self, archived, hot):
+        self.results = [archived, hot]
+        self.queries = 0
+
+    async def execute(self, statement):
+        rows = self.results[self.queries % 2]
+        self.queries += 1
+        return _Rows(rows)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return list(self.rows)
+
+
+def _analytics(archived, hot, owner="user"):
+    db = SplitSession(archived, hot)
+    return asyncio.run(get_analytics(db, owner)), db
+
+
+@pytest.mark.parametrize("n, split", [(0, 0), (1, 0), (2, 1), (15, 0), (15, 6), (40, 39)])
+def test_matches_plain_computation(n, split):
+    periods = _history(n, seed=n + split)
+    analytics, _ = _analytics(periods[:split], periods[split:])
+    expected = _expected(periods)
+
+    assert analytics.cycle_count == expected["cycle_count"]
+    assert (analytics.cycle_length_mean, analytics.cycle_length_std_dev) == expected["cycle"]
+    assert (analytics.period_length_mean, analytics.period_length_std_dev) == expected["length"]
+    assert {r.window: r.values for r in analytics.rolling_cycle_averages} == expected["rolling"]
+    assert {b.days: b.count for b in analytics.cycle_length_histogram} == expected["cycle_hist"]
+    assert {b.days: b.count for b in analytics.period_length_histogram} == expected["length_hist"]
+    assert [b.days for b in analytics.cycle_length_histogram] == sorted(expected["cycle_hist"])
+
+
+def test_outlier_gaps_are_excluded():
+    d = datetime.date(2020, 1, 1)
+    periods = [
+        (d, d + datetime.timedelta(days=4)),
+        (d + datetime.timedelta(days=28), d + datetime.timedelta(days=32)),
+        (d + datetime.timedelta(days=28 + MAX_PREDICTION_CYCLE_GAP_DAYS), None),
+    ]
+    analytics, _ = _analytics([], periods)
+
+    assert analytics.cycle_count == 1
+    assert analytics.cycle_length_mean == 28
+    assert analytics.cycle_length_std_dev == 0
+
+
+def test_cache_is_invalidated_by_local_writes():
+    periods = _history(5, seed=1)
+    first, db = _analytics([], periods)
+    assert get_cached_analytics("user") is first
+
+    asyncio.run(get_analytics(db, "user"))
+    assert db.queries == 2  # served from cache
+
+    _invalidate_stats_cache("user")
+    assert get_cached_analytics("user") is None
+    assert get_cached_analytics("demo") is None
+
+
+def test_cache_expires_after_ttl(monkeypatch):
+    first, _ = _analytics([], _history(5, seed=2))
+    _, expires_at, value = period_service._analytics_cache["user"]
+    assert value is first
+
+    monkeypatch.setattr(period_service.time, "monotonic", lambda: expires_at + 1)
+    assert get_cached_analytics("user") is None
@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+import random
+
+import pytest
+
+from app.models import ArchiveSummary, Period, PeriodArchive
+from app.schemas import PeriodResponse
+from app.services.archive_service import _fold_into_summary
+from app.services.period_service import (
+    PeriodArchivedError,
+    _weighted_average,
+    compute_stats,
+    delete_period,
+    end_period,
+    update_period,
+)
+
+
+def _empty_summary() -> ArchiveSummary:
+    return ArchiveSummary(
+        owner="user", period_count=0, length_weighted_sum=0, cycle_count=0, cycle_weighted_sum=0
+    )
+
+
+def _history(n: int, seed: int) -> list[tuple[datetime.date, datetime.date]]:
+    rng = random.Random(seed)
+    start = datetime.date(2010, 1, 1)
+    periods = []
+    for _ in range(n):
+        end = start + datetime.timedelta(days=rng.randint(2, 8))
+        periods.append((start, end))
+        # Occasionally a gap long enough to hit the outlier filter
+        start += datetime.timedelta(days=rng.choice([rng.randint(21, 35), 60]))
+    return periods
+
+
+@pytest.mark.parametrize("split", [0, 1, 2, 5, 9])
+def test_weighted_average_prior_sum_matches_full_list(split):
+    values = [28, 31, 26, 30, 29, 27, 33, 28, 30]
+    prior = values[:split]
+    prior_weighted_sum = sum(value * i for i, value in enumerate(prior, start=1))
+
+    assert _weighted_average(values[split:], len(prior), prior_weighted_sum) == _weighted_average(values)
+
+
+def test_weighted_average_empty():
+    assert _weighted_average([]) is None
+    assert _weighted_average([], prior_count=2, prior_weighted_sum=3 * 1 + 5 * 2) == round(13 / 3, 1)
+
+
+@pytest.mark.parametrize("split", [1, 7, 19])
+def test_compute_stats_unchanged_by_archiving(split):
+    periods = _history(20, seed=split)
+    summary = _empty_summary()
+    _fold_into_summary(summary, periods[:split])
+
+    assert compute_stats(periods[split:], summary) == compute_stats(periods, None)
+
+
+def test_compute_stats_everything_archived():
+    periods = _history(6, seed=0)
+    summary = _empty_summary()
+    _fold_into_summary(summary, periods)
+
+    assert compute_stats([], summary) == compute_stats(periods, None)
+
+
+def test_archived_period_is_flagged_in_response():
+    created_at = datetime.datetime(2012, 1, 1, tzinfo=datetime.timezone.utc)
+    start, end = datetime.date(2011, 1, 1), datetime.date(2011, 1, 5)
+    archived = PeriodArchive(id=1, start_date=start, end_date=end, created_at=created_at)
+    hot = Period(id=2, start_date=start, end_date=end, created_at=created_at)
+
+    assert PeriodResponse.model_validate(archived).archived is True
+    assert PeriodResponse.model_validate(hot).archived is False
+
+
+def test_writes_to_archived_period_are_rejected(fake_session):
+    today = datetime.date.today()
+    archived = PeriodArchive(id=1, start_date=today, end_date=today)
+
+    async def main():
+        db = fake_session(archived=archived)
+        with pytest.raises(PeriodArchivedError):
+            await update_period(db, 1, today, today, "user")
+        with pytest.raises(PeriodArchivedError):
+            await end_period(db, 1, today, "user")
+        with pytest.raises(PeriodArchivedError):
+            await delete_period(db, 1, "user")
+        assert db.commits == 0
+
+    asyncio.run(main())
+
+
+def test_missing_period_is_not_found(fake_session):
+    async def main():
+        with pytest.raises(LookupError):
+            await delete_period(fake_session(), 1, "user")
+
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import idempotency
+from app.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+class Handler:
+    """ASGI app that counts calls and answers with ``status``; waits on
+    ``gate`` first when one is set."""
+
+    def __init__(self, status: int = 201):
+        self.status = status
+        self.calls = 0
+        self.gate: asyncio.Event | None = None
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        message = await receive()
+        if self.gate is not None:
+            await self.gate.wait()
+        body = json.dumps({"call": self.calls, "echo": message["body"].decode()}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    monkeypatch.setattr(idempotency, "store", IdempotencyStore(ttl=60, max_entries=100))
+
+
+def _post(client: httpx.AsyncClient, body: dict, key: str = "k1", api_key: str = "a"):
+    return client.post("/periods", json=body, headers={"Idempotency-Key": key, "X-API-Key": api_key})
+
+
+def _run(handler: Handler, scenario):
+    async def main():
+        transport = httpx.ASGITransport(app=IdempotencyMiddleware(handler))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await scenario(client)
+
+    asyncio.run(main())
+
+
+def test_replays_without_calling_handler():
+    handler = Handler()
+
+    async def scenario(client):
+        first = await _post(client, {"start_date": "2024-01-01"})
+        second = await _post(client, {"start_date": "2024-01-01"})
+        assert first.status_code == second.status_code == 201
+        assert second.content == first.content
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+
+    _run(handler, scenario)
+    assert handler.calls == 1
+
+
+def test_body_mismatch_is_rejected():
+    handler = Handler()
+
+    async def scenario(client):
+        await _post(client, {"start_date": "2024-01-01"})
+        response = await _post(client, {"start_date": "2024-02-01"})
+        assert response.status_code == 422
+
+    _run(handler, scenario)
+    assert handler.calls == 1
+
+
+@pytest.mark.parametrize("status", [503, 401, 429])
+def test_transient_failures_are_not_stored(status):
+    handler = Handler(status=status)
+
+    async def scenario(client):
+        assert (await _post(client, {"start_date": "2024-01-01"})).status_code == status
+        handler.status = 201
+        response = await _post(client, {"start_date": "2024-01-01"})
+        assert response.status_code == 201
+        assert "idempotent-replayed" not in response.headers
+
+    _run(handler, scenario)
+    assert handler.calls == 2
+
+
+def test_keys_are_scoped_to_the_caller():
+    handler = Handler()
+
+    async def scenario(client):
+        await _post(client, {"start_date": "2024-01-01"}, api_key="a")
+        response = await _post(client, {"start_date": "2024-01-01"}, api_key="b")
+        assert "idempotent-replayed" not in response.headers
+        assert response.json()["call"] == 2
+
+    _run(handler, scenario)
+    assert handler.calls == 2
+
+
+def test_requests_without_a_key_pass_through():
+    handler = Handler()
+
+    async def scenario(client):
+        await client.post("/periods", json={"start_date": "2024-01-01"})
+        await client.post("/periods", json={"start_date": "2024-01-01"})
+
+    _run(handler, scenario)
+    assert handler.calls == 2
+
+
+def test_concurrent_duplicate_waits_then_replays():
+    handler = Handler()
+    handler.gate = asyncio.Event()
+
+    async def scenario(client):
+        first = asyncio.create_task(_post(client, {"start_date": "2024-01-01"}))
+        while handler.calls == 0:
+            await asyncio.sleep(0)
+        second = asyncio.create_task(_post(client, {"start_date": "2024-01-01"}))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+
+        handler.gate.set()
+        first, second = await first, await second
+        assert second.content == first.content
+        assert second.headers["idempotent-replayed"] == "true"
+
+    _run(handler, scenario)
+    assert handler.calls == 1
@@ -0,0 +1,107 @@
+import datetime
+import random
+
+from app.services.interval_index import OPEN_END, IntervalIndex, IntervalIndexCache
+
+D = datetime.date
+
+
+def _overlaps_brute_force(rows, start, end, exclude_id=None):
+    end_ord = OPEN_END if end is None else end.toordinal()
+    return any(
+        period_id != exclude_id
+        and s.toordinal() <= end_ord
+        and (OPEN_END if e is None else e.toordinal()) >= start.toordinal()
+        for period_id, s, e in rows
+    )
+
+
+def _random_rows(rng: random.Random, n: int, open_last: bool) -> list[tuple]:
+    rows = []
+    day = D(2020, 1, 1)
+    for period_id in range(1, n + 1):
+        start = day + datetime.timedelta(days=rng.randint(1, 30))
+        end = start + datetime.timedelta(days=rng.randint(0, 7))
+        rows.append((period_id, start, end))
+        day = end
+    if open_last and rows:
+        rows[-1] = (rows[-1][0], rows[-1][1], None)
+    rng.shuffle(rows)
+    return rows
+
+
+def test_overlaps_touching_and_gaps():
+    index = IntervalIndex([(1, D(2024, 1, 10), D(2024, 1, 14)), (2, D(2024, 2, 10), D(2024, 2, 14))])
+
+    assert index.overlaps(D(2024, 1, 14), D(2024, 1, 20))  # shares the end day
+    assert index.overlaps(D(2024, 1, 1), D(2024, 1, 10))  # shares the start day
+    assert index.overlaps(D(2024, 1, 1), D(2024, 3, 1))  # contains both
+    assert index.overlaps(D(2024, 1, 11), D(2024, 1, 12))  # contained
+    assert not index.overlaps(D(2024, 1, 15), D(2024, 2, 9))
+    assert not index.overlaps(D(2024, 1, 1), D(2024, 1, 9))
+    assert index.overlaps(D(2024, 2, 1), None)  # open query runs forever
+    assert not index.overlaps(D(2024, 2, 15), None)
+
+
+def test_overlaps_excludes_own_period():
+    index = IntervalIndex([(1, D(2024, 1, 10), D(2024, 1, 14)), (2, D(2024, 2, 10), D(2024, 2, 14))])
+
+    assert not index.overlaps(D(2024, 2, 8), D(2024, 2, 16), exclude_id=2)
+    assert index.overlaps(D(2024, 1, 12), D(2024, 2, 16), exclude_id=2)
+
+
+def test_open_period():
+    index = IntervalIndex([(1, D(2024, 1, 10), D(2024, 1, 14)), (2, D(2024, 2, 10), None)])
+
+    assert index.has_open()
+    assert index.overlaps(D(2030, 1, 1), D(2030, 1, 5))
+    index.remove(2)
+    assert not index.has_open()
+    assert not index.overlaps(D(2030, 1, 1), D(2030, 1, 5))
+
+
+def test_overlaps_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        rows = _random_rows(rng, rng.randint(0, 12), open_last=rng.random() < 0.3)
+        index = IntervalIndex(rows)
+        for _ in range(20):
+            start = D(2020, 1, 1) + datetime.timedelta(days=rng.randint(0, 400))
+            end = None if rng.random() < 0.2 else start + datetime.timedelta(days=rng.randint(0, 10))
+            exclude_id = rng.choice([None] + [r[0] for r in rows])
+            assert index.overlaps(start, end, exclude_id) == _overlaps_brute_force(rows, start, end, exclude_id)
+
+
+def test_add_and_remove_keep_index_sorted():
+    rng = random.Random(1)
+    rows = _random_rows(rng, 10, open_last=False)
+    index = IntervalIndex([])
+    for period_id, start, end in rows:
+        index.add(period_id, start, end)
+
+    assert list(index.starts) == sorted(index.starts)
+    assert list(index.ends) == sorted(index.ends)
+
+    for period_id, start, end in rows[:5]:
+        index.remove(period_id)
+    remaining = rows[5:]
+    assert sorted(index.ids) == sorted(r[0] for r in remaining)
+    assert index.overlaps(remaining[0][1], remaining[0][2])
+    assert not index.overlaps(rows[0][1], rows[0][2])
+
+    index.remove(999)  # unknown ids are ignored
+    assert len(index.ids) == len(remaining)
+
+
+def test_cache_evicts_least_recently_used_and_expired():
+    cache = IntervalIndexCache(max_owners=2, max_age=300)
+    a, b, c = IntervalIndex([]), IntervalIndex([]), IntervalIndex([])
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") is a
+    cache.put("c", c)
+    assert cache.get("b") is None
+    assert cache.get("a") is a
+
+    c.built_at -= 301
+    assert cache.get("c") is None
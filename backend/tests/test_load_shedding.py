@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import limiter as rate_limiter
+from app.config import settings
+from app.load_shedding import ConcurrencyLimiter, Overloaded, db_limiter
+from app.main import app
+
+
+def _limiter(**overrides) -> ConcurrencyLimiter:
+    params = dict(
+        max_in_flight=1,
+        min_in_flight=1,
+        max_queue_size=1,
+        target_queue_delay=10.0,
+        max_queue_wait=1.0,
+        retry_after=3,
+    )
+    params.update(overrides)
+    return ConcurrencyLimiter(**params)
+
+
+def test_sheds_when_queue_is_full():
+    async def main():
+        limiter = _limiter()
+        async with limiter.slot():
+            waiter = asyncio.create_task(limiter._acquire())
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded) as exc_info:
+                await limiter._acquire()
+            assert exc_info.value.retry_after == 3
+            assert limiter.shed_count == 1
+        await waiter
+        limiter._release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_sheds_after_max_queue_wait():
+    async def main():
+        limiter = _limiter(max_queue_wait=0.01)
+        async with limiter.slot():
+            with pytest.raises(Overloaded):
+                await limiter._acquire()
+        assert limiter.shed_count == 1
+        assert limiter.in_flight == 0
+        assert not limiter._waiters
+
+    asyncio.run(main())
+
+
+def test_release_hands_slot_to_next_waiter():
+    async def main():
+        limiter = _limiter()
+        order = []
+
+        async def worker(name):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(worker("a"), worker("b"))
+        assert order == ["a", "b"]
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_cancel_after_handover_releases_slot():
+    async def main():
+        limiter = _limiter()
+        await limiter._acquire()
+        waiter = asyncio.create_task(limiter._acquire())
+        await asyncio.sleep(0)
+
+        # Hand the slot over, then cancel the waiter before it resumes.
+        limiter._release()
+        assert limiter.in_flight == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.in_flight == 0
+        assert not limiter._waiters
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def main():
+        limiter = _limiter()
+        await limiter._acquire()
+        waiter = asyncio.create_task(limiter._acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert not limiter._waiters
+        limiter._release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_limit_backs_off_on_slow_queue_and_recovers():
+    limiter = _limiter(max_in_flight=10, min_in_flight=2, target_queue_delay=0.1)
+    limiter._adapt(0.5)
+    assert limiter.limit == 9
+    # At most one decrease per target interval
+    limiter._adapt(0.5)
+    assert limiter.limit == 9
+    limiter._adapt(0.0)
+    assert limiter.limit == 10
+    limiter._adapt(0.0)
+    assert limiter.limit == 10
+
+
+def test_auth_runs_before_taking_a_slot(monkeypatch):
+    rate_limiter.reset()
+    monkeypatch.setattr(db_limiter, "in_flight", db_limiter.limit)
+    monkeypatch.setattr(db_limiter, "max_queue_size", 0)
+    client = TestClient(app)
+    body = {"start_date": "2024-01-01"}
+
+    response = client.post("/periods", json=body, headers={"X-API-Key": "wrong"})
+    assert response.status_code == 401
+
+    response = client.post("/periods", json=body, headers={"X-API-Key": settings.api_key})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(db_limiter.retry_after)
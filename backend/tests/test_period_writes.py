@@ -0,0 +1,152 @@
+import asyncio
+import datetime
+
+import pytest
+
+from app.models import ArchiveSummary, Period
+from app.services import period_service
+from app.services.interval_index import IntervalIndex
+from app.services.period_service import _interval_index, _reindex, create_period, end_period, update_period
+
+TODAY = datetime.date.today()
+
+
+def _days_ago(n: int) -> datetime.date:
+    return TODAY - datetime.timedelta(days=n)
+
+
+def _prime(rows: list[tuple]) -> IntervalIndex:
+    index = IntervalIndex(rows)
+    period_service._interval_indexes.put("user", index)
+    return index
+
+
+def test_create_rejects_when_open_period_exists(fake_session):
+    _prime([(1, _days_ago(3), None)])
+
+    async def main():
+        with pytest.raises(ValueError, match="open period already exists"):
+            await create_period(fake_session(), TODAY, "user")
+
+    asyncio.run(main())
+
+
+def test_create_rejects_overlap(fake_session):
+    _prime([(1, _days_ago(10), _days_ago(5))])
+
+    async def main():
+        with pytest.raises(ValueError, match="overlaps"):
+            await create_period(fake_session(), _days_ago(5), "user")
+
+    asyncio.run(main())
+
+
+def test_create_rejects_archived_range(fake_session):
+    _prime([])
+    summary = ArchiveSummary(owner="user", last_start_date=_days_ago(40), last_end_date=_days_ago(35))
+
+    async def main():
+        db = fake_session(summary=summary)
+        with pytest.raises(ValueError, match="archived history"):
+            await create_period(db, _days_ago(35), "user")
+        assert db.commits == 0
+
+    asyncio.run(main())
+
+
+def test_create_adds_to_index(fake_session):
+    index = _prime([(1, _days_ago(10), _days_ago(5))])
+
+    async def main():
+        db = fake_session()
+        period = await create_period(db, _days_ago(2), "user")
+        assert db.commits == 1
+        assert period.id in index.open_ids
+        assert index.overlaps(TODAY, TODAY)
+
+    asyncio.run(main())
+
+
+def test_update_rejects_overlap_but_not_with_itself(fake_session):
+    _prime([(1, _days_ago(20), _days_ago(15)), (2, _days_ago(10), _days_ago(5))])
+    period = Period(id=2, start_date=_days_ago(10), end_date=_days_ago(5))
+
+    async def main():
+        db = fake_session(hot=period)
+        with pytest.raises(ValueError, match="overlaps"):
+            await update_period(db, 2, _days_ago(16), _days_ago(5), "user")
+
+        updated = await update_period(db, 2, _days_ago(12), _days_ago(4), "user")
+        assert (updated.start_date, updated.end_date) == (_days_ago(12), _days_ago(4))
+
+    asyncio.run(main())
+
+
+def test_update_rejects_archived_range(fake_session):
+    _prime([(2, _days_ago(10), _days_ago(5))])
+    period = Period(id=2, start_date=_days_ago(10), end_date=_days_ago(5))
+    summary = ArchiveSummary(owner="user", last_start_date=_days_ago(40), last_end_date=_days_ago(35))
+
+    async def main():
+        db = fake_session(hot=period, summary=summary)
+        with pytest.raises(ValueError, match="archived history"):
+            await update_period(db, 2, _days_ago(36), _days_ago(30), "user")
+        assert db.commits == 0
+
+    asyncio.run(main())
+
+
+def test_end_rejects_overlap(fake_session):
+    _prime([(1, _days_ago(20), None), (2, _days_ago(10), _days_ago(5))])
+    period = Period(id=1, start_date=_days_ago(20), end_date=None)
+
+    async def main():
+        db = fake_session(hot=period)
+        with pytest.raises(ValueError, match="overlaps"):
+            await end_period(db, 1, _days_ago(8), "user")
+        ended = await end_period(db, 1, _days_ago(15), "user")
+        assert ended.end_date == _days_ago(15)
+        assert not period_service._interval_indexes.get("user").has_open()
+
+    asyncio.run(main())
+
+
+def test_index_built_after_concurrent_commit_is_not_duplicated(fake_session):
+    # Another request committed period 3 and the index was (re)built from
+    # the DB, so it already contains 3, before that request reindexes.
+    rows = ((1, _days_ago(20), _days_ago(15)), (3, _days_ago(10), None))
+    committed = Period(id=3, start_date=_days_ago(10), end_date=None)
+
+    async def main():
+        index = await _interval_index(fake_session(rows=rows), "user")
+        _reindex("user", committed)
+        assert list(index.ids) == [1, 3]
+
+        # The next write still sees exactly one open period
+        committed.end_date = _days_ago(6)
+        _reindex("user", committed)
+        assert list(index.ids) == [1, 3]
+        assert not index.has_open()
+
+    asyncio.run(main())
+
+
+def test_index_build_is_not_cached_if_a_write_lands_during_it(fake_session):
+    class RacingSession(fake_session):
+        async def execute(self, statement):
+            # Period 3 is deleted and committed while the SELECT is in flight.
+            result = await super().execute(statement)
+            period_service._invalidate_stats_cache("user")
+            return result
+
+    rows = ((1, _days_ago(20), _days_ago(15)), (3, _days_ago(10), None))
+
+    async def main():
+        index = await _interval_index(RacingSession(rows=rows), "user")
+        assert list(index.ids) == [1, 3]
+        assert period_service._interval_indexes.get("user") is None
+
+        index = await _interval_index(fake_session(rows=rows[:1]), "user")
+        assert period_service._interval_indexes.get("user") is index
+
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import profiling
+from app.profiling import Profiler, ProfilingMiddleware, RequestProfile
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = Profiler(slow_request_ms=0, sample_interval_ms=1, keep_slowest=2)
+    monkeypatch.setattr(profiling, "profiler", profiler)
+    yield profiler
+    profiler.disable()
+
+
+def test_summary_orders_statements_by_total_time():
+    profile = RequestProfile("GET", "/periods")
+    profile.record_statement("SELECT  1\n FROM periods", 2.0)
+    profile.record_statement("SELECT  1\n FROM periods", 3.0)
+    profile.record_statement("SELECT 2", 10.0)
+    profile.add_sample("a;b")
+    profile.add_sample("a;b")
+    profile.add_sample("a;c")
+
+    summary = profile.summary(top=5)
+    assert summary["statement_count"] == 3
+    assert summary["sql_ms"] == 15.0
+    assert summary["statements"] == [
+        {"sql": "SELECT 2", "count": 1, "total_ms": 10.0},
+        {"sql": "SELECT 1 FROM periods", "count": 2, "total_ms": 5.0},
+    ]
+    assert summary["top_stacks"] == [{"stack": "a;b", "samples": 2}, {"stack": "a;c", "samples": 1}]
+
+
+def test_finish_keeps_only_the_slowest(profiler):
+    profiler.slow_request_ms = 5
+    for duration_ms in (1, 30, 10, 20):
+        profile = RequestProfile("GET", f"/{duration_ms}")
+        profile.started_at = time.perf_counter() - duration_ms / 1000
+        profiler.finish(profile)
+
+    assert [p["path"] for p in profiler.slowest()] == ["/30", "/20"]
+
+
+def test_summary_while_sampler_writes():
+    profile = RequestProfile("GET", "/periods")
+
+    def sampler():
+        # New keys resize the Counter, as new stacks do mid-request
+        for i in range(20000):
+            profile.add_sample(f"stack {i}")
+
+    thread = threading.Thread(target=sampler)
+    thread.start()
+    while thread.is_alive():
+        profile.summary()
+    thread.join()
+    assert sum(profile.samples.values()) == 20000
+
+
+def test_middleware_attributes_samples_to_request(profiler):
+    async def busy_handler(scope, receive, send):
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    profiler.enable()
+    scope = {"type": "http", "method": "GET", "path": "/periods/stats"}
+    asyncio.run(ProfilingMiddleware(busy_handler)(scope, None, None))
+
+    [summary] = profiler.slowest()
+    assert summary["path"] == "/periods/stats"
+    assert summary["duration_ms"] >= 100
+    assert summary["top_stacks"]
+    assert "busy_handler" in summary["top_stacks"][0]["stack"]
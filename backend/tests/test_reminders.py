@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app import reminders
+from app.load_shedding import Overloaded
+from app.reminders import LocalSender, ReminderScheduler, ReminderSender
+
+TODAY = datetime.date.today()
+IN_FIVE_DAYS = TODAY + datetime.timedelta(days=5)
+
+
+def _scheduler(batch_size: int = 100) -> ReminderScheduler:
+    return ReminderScheduler(LocalSender(), lead_days=2, hour_utc=9, batch_size=batch_size)
+
+
+def _at(date: datetime.date, hour: int = 9) -> datetime.datetime:
+    return datetime.datetime.combine(date, datetime.time(hour), tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def predictions(monkeypatch):
+    """owner -> predicted_next_start served by a stubbed get_stats."""
+    predicted: dict[str, datetime.date | None] = {}
+
+    @asynccontextmanager
+    async def db_session():
+        yield None
+
+    async def get_stats(db, owner):
+        if owner not in predicted:
+            raise Overloaded(retry_after=1)
+        return SimpleNamespace(predicted_next_start=predicted[owner])
+
+    monkeypatch.setattr(reminders, "db_session", db_session)
+    monkeypatch.setattr(reminders, "get_stats", get_stats)
+    return predicted
+
+
+def test_sender_must_implement_send():
+    with pytest.raises(TypeError):
+        ReminderSender()
+
+
+def test_pop_due_skips_superseded_and_sends_once():
+    scheduler = _scheduler()
+    later = IN_FIVE_DAYS + datetime.timedelta(days=1)
+    scheduler.schedule("user", IN_FIVE_DAYS)
+    scheduler.schedule("user", later)
+
+    # Reminders fire lead_days before the predicted start
+    assert scheduler.pop_due(_at(IN_FIVE_DAYS - datetime.timedelta(days=2))) == []
+    due = scheduler.pop_due(_at(later - datetime.timedelta(days=2)))
+    assert [(r.owner, r.predicted_start) for r in due] == [("user", later)]
+
+    # Rescheduling the same prediction after it was sent is a no-op
+    scheduler.schedule("user", later)
+    assert scheduler.pop_due(_at(IN_FIVE_DAYS + datetime.timedelta(days=10))) == []
+
+
+def test_pop_due_respects_batch_size():
+    scheduler = _scheduler(batch_size=2)
+    for owner in ("a", "b", "c"):
+        scheduler.schedule(owner, IN_FIVE_DAYS)
+
+    now = _at(IN_FIVE_DAYS)
+    assert len(scheduler.pop_due(now)) == 2
+    assert len(scheduler.pop_due(now)) == 1
+
+
+def test_load_marks_owners_dirty_except_demo():
+    scheduler = _scheduler()
+    scheduler.load(("user", "demo"))
+    assert scheduler._dirty == {"user"}
+
+
+def test_tick_schedules_loaded_owners_and_sends_when_due(predictions):
+    predictions["user"] = IN_FIVE_DAYS
+    scheduler = _scheduler()
+    scheduler.load(("user", "demo"))
+
+    async def main():
+        assert await scheduler.tick(_at(TODAY)) == 0
+        assert await scheduler.tick(_at(IN_FIVE_DAYS - datetime.timedelta(days=2))) == 1
+
+    asyncio.run(main())
+    assert [r.predicted_start for r in scheduler.sender.sent] == [IN_FIVE_DAYS]
+
+
+def test_tick_drops_reminders_already_due_at_startup(predictions):
+    # Remind-at was yesterday: it may have gone out before the restart.
+    predictions["user"] = TODAY + datetime.timedelta(days=1)
+    scheduler = _scheduler()
+    scheduler.load(("user",))
+
+    async def main():
+        assert await scheduler.tick() == 0
+
+        # A later change to the prediction is reminded about as usual
+        predictions["user"] = TODAY
+        scheduler.mark_dirty("user")
+        assert await scheduler.tick() == 1
+
+    asyncio.run(main())
+
+
+def test_tick_keeps_owner_dirty_when_shed(predictions):
+    scheduler = _scheduler()
+    scheduler.mark_dirty("user")
+
+    async def main():
+        with pytest.raises(Overloaded):
+            await scheduler.tick()
+        assert scheduler._dirty == {"user"}
+
+        predictions["user"] = IN_FIVE_DAYS
+        await scheduler.tick()
+        assert scheduler._dirty == set()
+        assert scheduler._live["user"].predicted_start == IN_FIVE_DAYS
+
+    asyncio.run(main())